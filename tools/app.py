@@ -1,18 +1,23 @@
 #!/usr/bin/env python3
 """Flask web UI for editing clarence.ng homepage cards."""
 
-import json
+import functools
+import threading
+from pathlib import Path
 
-from flask import Flask, jsonify, render_template, request, send_from_directory
+from flask import Flask, jsonify, make_response, render_template, request, send_from_directory
+from flask_orjson import OrjsonProvider
 
 from core import (
     ASSETS_IMG,
+    CARDS_PATH,
     SITE_ROOT,
     add_card,
-    cards_to_dicts,
+    apply_ops,
     git_publish,
     list_images,
     load_cards,
+    load_cards_fast,
     remove_card,
     reorder_card,
     save_cards,
@@ -20,28 +25,64 @@ from core import (
 )
 
 app = Flask(__name__)
+# Unlike Flask's default provider, OrjsonProvider never indents or sorts keys,
+# even under app.debug, so API responses stay compact and in file order.
+app.json = OrjsonProvider(app)
+
+# The server handles requests on several threads; writers must not interleave
+# their load -> modify -> save of cards.yml.
+_cards_lock = threading.Lock()
+
+
+def _locked(view):
+    """Run a view while holding the cards.yml write lock."""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with _cards_lock:
+            return view(*args, **kwargs)
+
+    return wrapper
+
+
+def _mtime_etag(*paths):
+    """Build an ETag value from the mtimes of the given files or directories."""
+    return "-".join(f"{p.stat().st_mtime_ns:x}" if p.exists() else "0" for p in paths)
+
+
+def _conditional(etag, build):
+    """Answer 304 if the client already has ``etag``, else call ``build`` and tag it."""
+    if request.if_none_match.contains_weak(etag):
+        resp = make_response("", 304)
+    else:
+        resp = make_response(build())
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
 
 
 @app.route("/assets/<path:filename>")
 def serve_assets(filename):
     """Serve static assets from the Jekyll site root."""
-    return send_from_directory(str(SITE_ROOT / "assets"), filename)
+    return send_from_directory(str(SITE_ROOT / "assets"), filename, max_age=86400, conditional=True)
 
 
 @app.route("/")
 def index():
-    cards = load_cards()
-    images = list_images()
-    return render_template("index.html", cards=cards_to_dicts(cards), images=images)
+    template = Path(app.root_path) / app.template_folder / "index.html"
+    etag = _mtime_etag(CARDS_PATH, ASSETS_IMG, template)
+    return _conditional(
+        etag, lambda: render_template("index.html", cards=load_cards_fast(), images=list_images())
+    )
 
 
 @app.route("/api/cards", methods=["GET"])
 def api_cards_get():
-    cards = load_cards()
-    return jsonify(cards_to_dicts(cards))
+    return _conditional(_mtime_etag(CARDS_PATH), lambda: jsonify(load_cards_fast()))
 
 
 @app.route("/api/cards", methods=["POST"])
+@_locked
 def api_cards_add():
     data = request.json
     cards = load_cards()
@@ -58,6 +99,7 @@ def api_cards_add():
 
 
 @app.route("/api/cards/<int:idx>", methods=["PUT"])
+@_locked
 def api_cards_update(idx):
     data = request.json
     cards = load_cards()
@@ -78,6 +120,7 @@ def api_cards_update(idx):
 
 
 @app.route("/api/cards/<int:idx>", methods=["DELETE"])
+@_locked
 def api_cards_delete(idx):
     cards = load_cards()
     try:
@@ -89,6 +132,7 @@ def api_cards_delete(idx):
 
 
 @app.route("/api/cards/reorder", methods=["POST"])
+@_locked
 def api_cards_reorder():
     data = request.json
     cards = load_cards()
@@ -100,7 +144,21 @@ def api_cards_reorder():
         return jsonify({"error": str(e)}), 400
 
 
+@app.route("/api/cards/batch", methods=["POST"])
+@_locked
+def api_cards_batch():
+    data = request.json
+    cards = load_cards()
+    try:
+        apply_ops(cards, data["ops"])
+        save_cards(cards)
+        return jsonify({"ok": True, "count": len(cards)})
+    except (IndexError, KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+
 @app.route("/api/publish", methods=["POST"])
+@_locked
 def api_publish():
     data = request.json or {}
     message = data.get("message", "Update cards")
@@ -113,8 +171,10 @@ def api_publish():
 
 @app.route("/api/images", methods=["GET"])
 def api_images():
-    return jsonify(list_images())
+    return _conditional(_mtime_etag(ASSETS_IMG), lambda: jsonify(list_images()))
 
 
 if __name__ == "__main__":
-    app.run(port=5050, debug=True)
+    from waitress import serve
+
+    serve(app, host="127.0.0.1", port=5050, threads=8)
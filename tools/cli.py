@@ -65,14 +65,9 @@ def cards_add():
     partition = click.confirm("Add partition line?", default=False)
 
     click.echo("Enter content (HTML allowed). Press Ctrl-D when done:")
-    content_lines = []
-    try:
-        while True:
-            line = input()
-            content_lines.append(line)
-    except EOFError:
-        pass
-    content = "\n".join(content_lines) + "\n"
+    content = sys.stdin.read()
+    if content and not content.endswith("\n"):
+        content += "\n"
 
     data = load_cards()
     add_card(data, logo=logo, title=title, content=content, center=center, partition=partition)
@@ -123,17 +118,11 @@ def cards_edit(index):
         click.echo("--- Current content ---")
         click.echo(existing)
         click.echo("--- Enter new content (or Ctrl-D to keep current) ---")
-        lines = []
-        try:
-            while True:
-                line = input()
-                lines.append(line)
-        except EOFError:
-            pass
-        if lines:
-            content = "\n".join(lines) + "\n"
-        else:
+        content = sys.stdin.read()
+        if not content:
             content = None  # keep existing
+        elif not content.endswith("\n"):
+            content += "\n"
 
     update_card(data, index, logo=logo, title=title, content=content, center=center, partition=partition)
     save_cards(data)
@@ -186,7 +175,7 @@ def preview():
 @main.command()
 @click.option("-m", "--message", default="Update cards", help="Commit message")
 def publish(message):
-    """Git add, commit, and push to deploy."""
+    """Commit _data/cards.yml and push to deploy."""
     if not click.confirm(f"Publish with message: '{message}'?"):
         click.echo("Cancelled.")
         return
@@ -1,9 +1,11 @@
 """Shared core for website editor: YAML I/O, card operations, and git helpers."""
 
-import io
+import copy
+import functools
 import os
+import re
 import subprocess
-import textwrap
+import tempfile
 from pathlib import Path
 
 from ruamel.yaml import YAML
@@ -12,6 +14,25 @@ SITE_ROOT = Path(__file__).resolve().parent.parent
 CARDS_PATH = SITE_ROOT / "_data" / "cards.yml"
 ASSETS_IMG = SITE_ROOT / "assets" / "img"
 
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+_TOP_INDENT_RE = re.compile(r"^  ", re.MULTILINE)
+
+# Text fields update_card() may change, and whether an empty value removes
+# the key instead of storing it. Flags are stored as True or removed.
+# Content is handled on its own, between the two, to keep key order.
+_TEXT_FIELDS = (("logo", False), ("title", True))
+_FLAG_FIELDS = ("center", "partition")
+
+# Parsed cards.yml, keyed by the file's mtime so edits on disk invalidate it.
+# The two keys are updated separately, which is only safe because every
+# load_cards()/save_cards() caller in app.py holds its _cards_lock.
+_CACHE = {"mtime": None, "cards": None}
+
+# (mtime, names) for assets/img/. Replaced as one tuple so unlocked readers
+# on other threads never pair one scan's names with another's mtime.
+_IMG_CACHE = (None, ())
+
 
 def _yaml():
     """Create a ruamel.yaml instance configured for round-trip preservation."""
@@ -23,22 +44,55 @@ def _yaml():
 
 
 def load_cards():
-    """Load cards from _data/cards.yml and return as a ruamel.yaml list."""
-    y = _yaml()
+    """Load cards from _data/cards.yml and return as a ruamel.yaml list.
+
+    Callers get their own copy, so mutating it never touches the cache.
+    """
+    mtime = os.stat(CARDS_PATH).st_mtime_ns
+    if _CACHE["mtime"] != mtime:
+        y = _yaml()
+        with open(CARDS_PATH, "r") as f:
+            _CACHE["cards"] = y.load(f)
+        _CACHE["mtime"] = mtime
+    return copy.deepcopy(_CACHE["cards"])
+
+
+def load_cards_fast():
+    """Load cards as plain dicts via ruamel's safe (C) loader, for read-only callers.
+
+    Uses the same YAML 1.2 rules as load_cards(), so scalars such as ``No``
+    or ``3:30`` stay strings; use load_cards() when the result will be
+    modified and saved back.
+    """
     with open(CARDS_PATH, "r") as f:
-        return y.load(f)
+        return YAML(typ="safe").load(f)
 
 
 def save_cards(cards):
     """Save cards back to _data/cards.yml preserving formatting."""
     y = _yaml()
-    buf = io.BytesIO()
-    y.dump(cards, buf)
-    # The indent settings add a 2-space indent to the top-level sequence.
-    # Remove it to match the original file format.
-    text = textwrap.dedent(buf.getvalue().decode())
-    with open(CARDS_PATH, "w") as f:
-        f.write(text)
+    # Write to a temp file and swap it in, so concurrent readers never see a
+    # truncated or half-written cards.yml.
+    mode = os.stat(CARDS_PATH).st_mode & 0o777
+    with tempfile.NamedTemporaryFile(
+        "w", dir=CARDS_PATH.parent, prefix=".cards-", suffix=".yml", delete=False
+    ) as f:
+        tmp = f.name
+        try:
+            # The indent settings add a 2-space indent to the top-level
+            # sequence. Remove it to match the original file format. With a
+            # transform ruamel buffers the whole document before writing;
+            # encoding=None makes that a StringIO, skipping encode/decode.
+            y.encoding = None
+            y.dump(cards, f, transform=lambda text: _TOP_INDENT_RE.sub("", text))
+        except BaseException:
+            f.close()
+            os.unlink(tmp)
+            raise
+    os.chmod(tmp, mode)
+    os.replace(tmp, CARDS_PATH)
+    _CACHE["cards"] = copy.deepcopy(cards)
+    _CACHE["mtime"] = os.stat(CARDS_PATH).st_mtime_ns
 
 
 def card_to_dict(card):
@@ -56,8 +110,12 @@ def card_to_dict(card):
 
 
 def cards_to_dicts(cards):
-    """Convert all cards to plain dicts."""
-    return [card_to_dict(c) for c in cards]
+    """Convert all cards from load_cards() to plain dicts.
+
+    Read-only callers should use load_cards_fast(), which already returns
+    plain dicts in the same shape.
+    """
+    return list(map(card_to_dict, cards))
 
 
 def add_card(cards, logo="", title="", content="", center=False, partition=False):
@@ -106,39 +164,72 @@ def update_card(cards, index, logo=None, title=None, content=None, center=None,
     if not (0 <= index < len(cards)):
         raise IndexError(f"Card index {index} out of range")
     card = cards[index]
-    if logo is not None:
-        card["logo"] = logo
-    if title is not None:
-        if title:
-            card["title"] = title
-        elif "title" in card:
-            del card["title"]
+    values = {"logo": logo, "title": title, "center": center, "partition": partition}
+    for name, drop_when_empty in _TEXT_FIELDS:
+        value = values[name]
+        if value is None:
+            continue
+        if value or not drop_when_empty:
+            card[name] = value
+        elif name in card:
+            del card[name]
     if content is not None:
         card["content"] = [LiteralScalarString(content)]
-    if center is not None:
-        if center:
-            card["center"] = True
-        elif "center" in card:
-            del card["center"]
-    if partition is not None:
-        if partition:
-            card["partition"] = True
-        elif "partition" in card:
-            del card["partition"]
+    for name in _FLAG_FIELDS:
+        value = values[name]
+        if value is None:
+            continue
+        if value:
+            card[name] = True
+        elif name in card:
+            del card[name]
+
+
+def apply_ops(cards, ops):
+    """Apply a sequence of card operations in order, without saving.
+
+    Each op is a dict with an "op" key of "add", "update", "remove" or
+    "reorder". "add" and "update" take a "fields" dict of card fields,
+    "update" and "remove" take an "idx", and "reorder" takes "from" and "to".
+    """
+    for op in ops:
+        kind = op["op"]
+        if kind == "add":
+            add_card(cards, **op.get("fields", {}))
+        elif kind == "update":
+            update_card(cards, op["idx"], **op.get("fields", {}))
+        elif kind == "remove":
+            remove_card(cards, op["idx"])
+        elif kind == "reorder":
+            reorder_card(cards, op["from"], op["to"])
+        else:
+            raise ValueError(f"Unknown card op {kind!r}")
 
 
 def list_images():
-    """List available images in assets/img/."""
-    if ASSETS_IMG.exists():
-        return sorted(f.name for f in ASSETS_IMG.iterdir() if f.is_file())
-    return []
+    """List available images in assets/img/ as a tuple of file names."""
+    global _IMG_CACHE
+    try:
+        mtime = ASSETS_IMG.stat().st_mtime_ns
+        cached = _IMG_CACHE
+        if cached[0] == mtime:
+            return cached[1]
+        # DirEntry.is_file() reuses the type from the directory read,
+        # so this avoids a stat() per file.
+        with os.scandir(ASSETS_IMG) as it:
+            names = tuple(sorted(e.name for e in it if e.is_file()))
+    except FileNotFoundError:
+        return ()
+    _IMG_CACHE = (mtime, names)
+    return names
 
 
 def git_publish(message="Update cards"):
-    """Stage _data/cards.yml, commit, and push."""
+    """Commit _data/cards.yml and push."""
     cwd = str(SITE_ROOT)
-    subprocess.run(["git", "add", "_data/cards.yml"], cwd=cwd, check=True)
-    subprocess.run(["git", "commit", "-m", message], cwd=cwd, check=True)
+    # --only commits the file's working-tree contents directly, so no
+    # separate `git add` is needed; anything else staged is left alone.
+    subprocess.run(["git", "commit", "--only", "_data/cards.yml", "-m", message], cwd=cwd, check=True)
     subprocess.run(["git", "push"], cwd=cwd, check=True)
 
 
@@ -146,15 +237,18 @@ def content_preview(card, max_len=80):
     """Get a short text preview of a card's content."""
     raw = card.get("content", "")
     if isinstance(raw, list):
-        text = " ".join(str(item) for item in raw)
+        text = " ".join(map(str, raw))
     else:
         text = str(raw)
-    # Strip HTML tags for preview
-    import re
+    return _preview_text(text, max_len)
+
 
-    text = re.sub(r"<[^>]+>", "", text)
-    text = text.replace("&#x2022;", "*").replace("\n", " ").strip()
-    text = re.sub(r"\s+", " ", text)
+@functools.lru_cache(maxsize=512)
+def _preview_text(text, max_len):
+    """Strip HTML and collapse whitespace; memoized since content rarely changes."""
+    text = _TAG_RE.sub("", text)
+    text = text.replace("&#x2022;", "*").strip()
+    text = _WS_RE.sub(" ", text)
     if len(text) > max_len:
         text = text[:max_len] + "..."
     return text